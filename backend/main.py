@@ -3,19 +3,34 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, HTTPException, Request, status, Depends
+from fastapi import FastAPI, HTTPException, Request, status, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import uvicorn
 import aiomysql
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, field_validator
 import os
 from dotenv import load_dotenv
 import json
 import hashlib
+import hmac
+import base64
+import secrets
+import time
+import jwt
+import orjson
+import asyncio
+import concurrent.futures
+import logging
+import logging.handlers
+import queue
+from collections import OrderedDict
+from passlib.context import CryptContext
+from argon2 import PasswordHasher, Type as Argon2Type
+from argon2.exceptions import InvalidHashError, VerificationError
 
 # Import email service
 from email_service import email_service
@@ -73,8 +88,72 @@ MYSQL_PORT = int(os.getenv("MYSQL_PORT", "3306"))
 MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "medical_center")
+# Pool sizes are per worker process; by default ~100 connections are split
+# across WORKERS so the total stays under MySQL's max_connections (151).
+WORKERS = int(os.getenv("WORKERS", "4"))
+MYSQL_POOL_MIN = int(os.getenv("MYSQL_POOL_MIN", "2"))
+MYSQL_POOL_MAX = int(os.getenv("MYSQL_POOL_MAX", str(max(5, 100 // max(WORKERS, 1)))))
+MYSQL_POOL_RECYCLE = int(os.getenv("MYSQL_POOL_RECYCLE", "300"))
+
+# Request-path logging. Records are queued and written by a QueueListener thread,
+# so handlers never block the event loop on stdout.
+logger = logging.getLogger("medical_center")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").strip().lower()  # uvicorn wants lowercase
+# uvicorn also accepts "trace", which stdlib logging doesn't know; anything the
+# logging module can't resolve falls back to DEBUG for the app logger
+_app_log_level = logging.getLevelName(LOG_LEVEL.upper())  # int for known names
+logger.setLevel(_app_log_level if isinstance(_app_log_level, int) else logging.DEBUG)
+logger.propagate = False
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
 
 ADMIN_BYPASS_ENABLED = os.getenv("ADMIN_BYPASS_ENABLED", "false").strip().lower() == "true"
+_ADMIN_BYPASS_CREDENTIALS = frozenset({
+    ("admin", "admin"),
+    ("admin@medical.com", "admin"),
+    ("admin@medical.com", "admin@123"),
+})
+
+# Email domains that register as doctors (professional addresses)
+_DOCTOR_EMAIL_DOMAINS = frozenset({"medical.com", "medicalcenter.com", "hospital.com"})
+
+# Password hashing: Argon2id (memory-hard). Cost is configurable so dev/demo
+# servers can run cheaper while production keeps the 64 MiB profile.
+# Argon2 goes straight to argon2-cffi; passlib is only kept to verify older
+# bcrypt and hex_sha256 rows, which are rehashed on next login.
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+_argon2_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=1,
+    type=Argon2Type.ID,
+)
+_legacy_pwd_context = CryptContext(schemes=["bcrypt", "hex_sha256"])
+# Dedicated pool for hashing so logins never queue behind other to_thread work.
+# argon2-cffi and bcrypt release the GIL, so threads scale across cores. Like the
+# MySQL pool this is per worker process, so the cores are split across WORKERS
+# (each concurrent Argon2 hash also holds ARGON2_MEMORY_COST of memory).
+PASSWORD_HASH_WORKERS = int(os.getenv(
+    "PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 4) // max(WORKERS, 1)))
+))
+
+# Access token (signed JWT) configuration
+SECRET_KEY = os.getenv("SECRET_KEY") or secrets.token_urlsafe(32)
+JWT_ALGORITHM = "HS256"
+_SIGNING_KEY = SECRET_KEY.encode()
+# The HS256 header never changes, so its base64url segment is encoded once
+_JWT_HEADER_SEGMENT = base64.urlsafe_b64encode(
+    orjson.dumps({"alg": JWT_ALGORITHM, "typ": "JWT"})
+).rstrip(b"=")
+ACCESS_TOKEN_EXPIRE_SECONDS = int(os.getenv("ACCESS_TOKEN_EXPIRE_SECONDS", "3600"))
+
+# Verified tokens: blake2b(token) -> (expires_at, user_id), LRU-bounded.
+# Entries never outlive the token's own exp; invalid tokens are never cached.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "10"))
+_token_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
 
 # Pydantic Models
 class UserBase(BaseModel):
@@ -90,6 +169,11 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, v: str) -> str:
+        return v.strip().lower()
+
 class Registration(BaseModel):
     first_name: str
     last_name: str
@@ -105,6 +189,12 @@ class Registration(BaseModel):
     agree_to_terms: bool
     acknowledge_educational: bool
 
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, v: str) -> str:
+        # Emails are stored lowercased so lookups are plain equality on the unique index
+        return v.strip().lower()
+
 class UserResponse(BaseModel):
     id: int
     email: str
@@ -162,12 +252,18 @@ class CaseReview(BaseModel):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events"""
+    _log_listener.start()
+    app.state.hash_pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+    )
     print("🚀 Starting Medical Center Backend...")
     print(f"📊 MySQL Configuration: {MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}")
     
     try:
         await init_database()
         print("✅ MySQL database initialized successfully")
+        # Warm the shared connection pool before the first request arrives
+        await get_connection()
     except Exception as e:
         print(f"⚠️ Database warning: {e}")
         print("⚠️ Starting with fallback mode")
@@ -175,6 +271,13 @@ async def lifespan(app: FastAPI):
     yield
     
     print("👋 Shutting down...")
+    global pool
+    if pool is not None:
+        pool.close()
+        await pool.wait_closed()
+        pool = None
+    app.state.hash_pool.shutdown(wait=True)
+    _log_listener.stop()
 
 app = FastAPI(
     title="DXscope API",
@@ -182,6 +285,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -191,7 +295,8 @@ app.add_middleware(
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:3001", "http://127.0.0.1:3001"],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
+    allow_headers=["Authorization", "Content-Type", "Accept", "Accept-Language", "X-Requested-With"],
+    max_age=86400,  # let browsers cache preflight responses for 24h
 )
 
 # Include Gemini AI router if available
@@ -230,8 +335,9 @@ async def get_connection():
             user=MYSQL_USER,
             password=MYSQL_PASSWORD,
             db=MYSQL_DATABASE,
-            minsize=1,
-            maxsize=10,
+            minsize=MYSQL_POOL_MIN,
+            maxsize=MYSQL_POOL_MAX,
+            pool_recycle=MYSQL_POOL_RECYCLE,
             autocommit=True
         )
     return pool
@@ -249,6 +355,12 @@ async def init_database():
         )
         cursor = await conn.cursor()
         
+        # Every uvicorn worker runs this at startup; a server-side named lock makes
+        # them take turns so the migrations and seeding below run one at a time.
+        await cursor.execute("SELECT GET_LOCK('medical_center_init', 60)")
+        if (await cursor.fetchone())[0] != 1:
+            raise RuntimeError("Timed out waiting for another worker to initialize the database")
+        
         # Create database if it doesn't exist
         await cursor.execute(f"CREATE DATABASE IF NOT EXISTS {MYSQL_DATABASE}")
         await cursor.execute(f"USE {MYSQL_DATABASE}")
@@ -270,6 +382,9 @@ async def init_database():
         )
         """)
         
+        # --- Normalize stored emails to lowercase (login/register look up by exact match) ---
+        await cursor.execute("UPDATE users SET email = LOWER(TRIM(email)) WHERE BINARY email <> LOWER(TRIM(email))")
+
         # --- Migrate users table: add address + sex if missing ---
         try:
             await cursor.execute("ALTER TABLE users ADD COLUMN address VARCHAR(500) NULL")
@@ -302,6 +417,27 @@ async def init_database():
         )
         """)
         
+        # --- Indexes for the case list queries (ignored if they already exist) ---
+        # Doctor queue: filter/sort by status + created_at; patient history: patient_id + created_at
+        try:
+            await cursor.execute("CREATE INDEX idx_cases_status_created ON medical_cases (status, created_at)")
+        except Exception:
+            pass
+        try:
+            await cursor.execute("CREATE INDEX idx_cases_patient_created ON medical_cases (patient_id, created_at)")
+        except Exception:
+            pass
+        # Doctor case list pages newest-first with LIMIT/OFFSET
+        try:
+            await cursor.execute("CREATE INDEX idx_cases_created ON medical_cases (created_at)")
+        except Exception:
+            pass
+        # Nothing filters by (doctor_id, status) and the FK already indexes doctor_id
+        try:
+            await cursor.execute("DROP INDEX idx_cases_doctor_status ON medical_cases")
+        except Exception:
+            pass
+        
         # Ensure status defaults are enforced (older tables may allow NULL/empty)
         await cursor.execute(
             "ALTER TABLE medical_cases MODIFY COLUMN status ENUM('pending_review','in_review','completed') NOT NULL DEFAULT 'pending_review'"
@@ -382,6 +518,12 @@ async def init_database():
         if "duration" not in prescription_columns:
             await cursor.execute("ALTER TABLE prescriptions ADD COLUMN duration INT NOT NULL DEFAULT 0")
 
+        # Latest-prescription-per-case lookups (case list signature subquery)
+        try:
+            await cursor.execute("CREATE INDEX idx_prescriptions_case_created ON prescriptions (case_id, created_at)")
+        except Exception:
+            pass
+
         # Normalize medical_cases.status for legacy rows.
         # Using COALESCE(NULLIF(...)) avoids invalid ENUM writes while still cleaning blanks.
         await cursor.execute(
@@ -408,14 +550,14 @@ async def init_database():
         
         if admin_exists == 0:
             print("👨‍⚕️ Creating initial admin account...")
-            password_hash = hashlib.sha256("Admin@123".encode()).hexdigest()
+            password_hash = hash_password("Admin@123")
             await cursor.execute("""
-            INSERT INTO users (email, password_hash, role, first_name, last_name, is_active)
+            INSERT IGNORE INTO users (email, password_hash, role, first_name, last_name, is_active)
             VALUES (%s, %s, 'admin', 'System', 'Admin', TRUE)
             """, ("admin@medical.com", password_hash))
             print("✅ Admin account created (email: admin@medical.com, password: Admin@123)")
         
-        # Add demo medical cases
+        # Add demo medical cases (only reached by one worker at a time, see GET_LOCK above)
         await cursor.execute("SELECT COUNT(*) FROM medical_cases")
         case_count = (await cursor.fetchone())[0]
         
@@ -432,7 +574,7 @@ async def init_database():
             else:
                 # Create demo patient user for the demo cases
                 await cursor.execute("""
-                INSERT INTO users (email, password_hash, role, first_name, last_name, is_active)
+                INSERT IGNORE INTO users (email, password_hash, role, first_name, last_name, is_active)
                 VALUES (%s, %s, %s, %s, %s, TRUE)
                 """, (
                     "demo.patient@gmail.com",
@@ -441,55 +583,60 @@ async def init_database():
                     "Demo",
                     "Patient"
                 ))
-                demo_patient_id = cursor.lastrowid
-                print("✅ Demo patient account created (email: demo.patient@gmail.com, password: Demo@123)")
-            
-            # Demo case 1
-            await cursor.execute("""
-            INSERT INTO medical_cases (patient_id, symptoms, ai_assessment, status)
-            VALUES (%s, %s, %s, 'pending_review')
-            """, (
-                demo_patient_id,
-                json.dumps({
-                    "description": "Headache for 3 days, fever 38.5°C, fatigue, mild dizziness",
-                    "duration_hours": 72,
-                    "severity": 6,
-                    "temperature": 38.5,
-                    "has_fever": True,
-                    "has_headache": True,
-                    "has_fatigue": True
-                }),
-                json.dumps({
-                    "possible_conditions": ["Tension Headache", "Viral Infection"],
-                    "confidence_score": 0.75,
-                    "recommended_tests": ["Physical Examination", "Temperature Check"],
-                    "urgency_level": "medium",
-                    "medical_note": "AI medical assessment based on symptoms"
-                })
-            ))
+                if cursor.rowcount:
+                    demo_patient_id = cursor.lastrowid
+                    print("✅ Demo patient account created (email: demo.patient@gmail.com, password: Demo@123)")
+                else:
+                    # Registered by someone else in the meantime
+                    await cursor.execute("SELECT id FROM users WHERE email = %s", ("demo.patient@gmail.com",))
+                    demo_patient_id = (await cursor.fetchone())[0]
             
-            # Demo case 2
-            await cursor.execute("""
+            # Demo cases are sent as one multi-row INSERT via executemany
+            demo_cases = [
+                (
+                    demo_patient_id,
+                    json.dumps({
+                        "description": "Headache for 3 days, fever 38.5°C, fatigue, mild dizziness",
+                        "duration_hours": 72,
+                        "severity": 6,
+                        "temperature": 38.5,
+                        "has_fever": True,
+                        "has_headache": True,
+                        "has_fatigue": True
+                    }),
+                    json.dumps({
+                        "possible_conditions": ["Tension Headache", "Viral Infection"],
+                        "confidence_score": 0.75,
+                        "recommended_tests": ["Physical Examination", "Temperature Check"],
+                        "urgency_level": "medium",
+                        "medical_note": "AI medical assessment based on symptoms"
+                    }),
+                    "pending_review"
+                ),
+                (
+                    demo_patient_id,
+                    json.dumps({
+                        "description": "Sneezing, runny nose, itchy eyes, congestion for 2 weeks",
+                        "duration_hours": 336,
+                        "severity": 3,
+                        "has_cough": False,
+                        "has_headache": False,
+                        "has_fatigue": False
+                    }),
+                    json.dumps({
+                        "possible_conditions": ["Allergic Rhinitis", "Seasonal Allergies"],
+                        "confidence_score": 0.85,
+                        "recommended_tests": ["Allergy Test", "Physical Examination"],
+                        "urgency_level": "low",
+                        "medical_note": "AI medical assessment based on symptoms"
+                    }),
+                    "pending_review"
+                ),
+            ]
+            await cursor.executemany("""
             INSERT INTO medical_cases (patient_id, symptoms, ai_assessment, status)
-            VALUES (%s, %s, %s, 'pending_review')
-            """, (
-                demo_patient_id,
-                json.dumps({
-                    "description": "Sneezing, runny nose, itchy eyes, congestion for 2 weeks",
-                    "duration_hours": 336,
-                    "severity": 3,
-                    "has_cough": False,
-                    "has_headache": False,
-                    "has_fatigue": False
-                }),
-                json.dumps({
-                    "possible_conditions": ["Allergic Rhinitis", "Seasonal Allergies"],
-                    "confidence_score": 0.85,
-                    "recommended_tests": ["Allergy Test", "Physical Examination"],
-                    "urgency_level": "low",
-                    "medical_note": "AI medical assessment based on symptoms"
-                })
-            ))
+            VALUES (%s, %s, %s, %s)
+            """, demo_cases)
             
             print("✅ Demo medical cases added!")
         
@@ -501,6 +648,7 @@ async def init_database():
     finally:
         try:
             if cursor:
+                await cursor.execute("SELECT RELEASE_LOCK('medical_center_init')")
                 await cursor.close()
         except:
             pass
@@ -512,38 +660,84 @@ async def init_database():
 
 # Authentication helper
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+    return _argon2_hasher.hash(password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Check a password; also return a replacement hash if the stored one is outdated"""
+    if hashed_password.startswith("$argon2"):
+        try:
+            _argon2_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False, None
+        if _argon2_hasher.check_needs_rehash(hashed_password):
+            return True, _argon2_hasher.hash(plain_password)
+        return True, None
+    try:
+        legacy_ok = _legacy_pwd_context.verify(plain_password, hashed_password)
+    except (ValueError, TypeError):
+        # Empty, plaintext or malformed stored hash: treat as a failed login
+        return False, None
+    if not legacy_ok:
+        return False, None
+    return True, _argon2_hasher.hash(plain_password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return hash_password(plain_password) == hashed_password
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+async def _run_password_hashing(func, *args):
+    """Run a hashing call on the app's hash pool, off the event loop"""
+    hash_pool = getattr(app.state, "hash_pool", None)
+    return await asyncio.get_running_loop().run_in_executor(hash_pool, func, *args)
+
+# JSON column helper
+def _json_fragment(raw, default):
+    """Embed a MySQL JSON column value into an orjson response without parsing it"""
+    return orjson.Fragment(raw) if raw else default
+
+# Token helpers
+def create_access_token(user_id: int, role: str) -> str:
+    """Issue a signed, expiring access token for a user"""
+    payload = {
+        "sub": str(user_id),
+        "role": role,
+        "exp": int(time.time()) + ACCESS_TOKEN_EXPIRE_SECONDS,
+    }
+    # Assembled by hand (header.payload.signature); verified with jwt.decode
+    signing_input = _JWT_HEADER_SEGMENT + b"." + base64.urlsafe_b64encode(orjson.dumps(payload)).rstrip(b"=")
+    signature = hmac.new(_SIGNING_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + base64.urlsafe_b64encode(signature).rstrip(b"=")).decode()
 
-# Token parsing helper
 def _extract_user_id_from_auth_header(auth_header: str | None) -> int | None:
     if not auth_header or not auth_header.startswith("Bearer "):
         return None
 
     token = auth_header.split(" ", 1)[1]
+    if token.startswith("demo-token-"):
+        # demo-token-patient / demo-token-doctor / demo-token-admin
+        # These are only for demo mode; caller decides if it wants to accept them.
+        return None
+
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        if cached[0] > now:
+            _token_cache.move_to_end(key)
+            return cached[1]
+        del _token_cache[key]
+
     try:
-        if token.startswith("auth-token-"):
-            token_parts = token.split("-")
-            if len(token_parts) >= 3:
-                return int(token_parts[2])
-        if token.startswith("admin-bypass-token-"):
-            return 0
-        if token.startswith("demo-token-"):
-            # demo-token-patient / demo-token-doctor / demo-token-admin
-            # These are only for demo mode; caller decides if it wants to accept them.
-            return None
-
-        # Format: {role}_token_{user_id}_{timestamp}
-        if "_token_" in token:
-            token_parts = token.split("_")
-            if len(token_parts) >= 3:
-                return int(token_parts[2])
-    except (ValueError, IndexError):
+        payload = jwt.decode(
+            token, _SIGNING_KEY, algorithms=[JWT_ALGORITHM], options={"require": ["exp", "sub"]}
+        )
+        user_id = int(payload["sub"])
+    except (jwt.PyJWTError, ValueError):
         return None
 
-    return None
+    _token_cache[key] = (min(payload["exp"], now + TOKEN_CACHE_TTL), user_id)
+    if len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+    return user_id
 
 # API Routes
 @app.get("/")
@@ -566,41 +760,60 @@ async def register_user(registration: Registration):
         )
     
     # Auto-detect role based on email domain and required fields
-    email = registration.email.lower()
+    email = registration.email
     
     # Check if this is a doctor registration (has medical license and specialization)
     if (registration.medical_license and registration.specialization and 
         registration.medical_license.strip() and registration.specialization.strip()):
         role = 'doctor'
-        print(f"🎓 Detected doctor registration: {email}")
-    elif '@medical.com' in email or '@medicalcenter.com' in email or '@hospital.com' in email:
+        logger.debug("Detected doctor registration: %s", email)
+    elif email.rpartition('@')[2] in _DOCTOR_EMAIL_DOMAINS:
         role = 'doctor'
-        print(f"🎓 Detected doctor registration (professional email): {email}")
+        logger.debug("Detected doctor registration (professional email): %s", email)
     else:
         role = 'patient'
-        print(f"👤 Detected patient registration: {email}")
+        logger.debug("Detected patient registration: %s", email)
     
-    pool = await get_connection()
-    
-    async with pool.acquire() as conn:
-        cursor = await conn.cursor()
-        
-        # Check if email already exists
-        await cursor.execute("SELECT id FROM users WHERE email = %s", (registration.email,))
-        existing_user = await cursor.fetchone()
-        
-        if existing_user:
+    # Role-specific validation happens before touching the database
+    dob_date = None
+    if role == 'doctor':
+        if not registration.medical_license or not registration.specialization:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
+                detail="Medical license and specialization are required for doctor registration"
+            )
+    else:
+        if not registration.date_of_birth:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Date of birth is required for patient registration"
             )
         
-        # Hash password
-        password_hash = hash_password(registration.password)
+        # Convert date string to date object
+        try:
+            dob_date = datetime.strptime(registration.date_of_birth, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid date format. Please use YYYY-MM-DD format."
+            )
+    
+    # Hash password
+    password_hash = await _run_password_hashing(hash_password, registration.password)
+    
+    # Set active status based on role (doctors need verification)
+    is_active = False if role == 'doctor' else True
+    
+    pool = await get_connection()
+    
+    async with pool.acquire() as conn:
+        cursor = await conn.cursor()
         
+        # Duplicate email / medical license are caught by the UNIQUE keys on insert
+        # instead of a separate SELECT first. User + profile go in one transaction
+        # so a failed profile insert never leaves an orphaned user row behind.
         try:
-            # Set active status based on role (doctors need verification)
-            is_active = False if role == 'doctor' else True
+            await conn.begin()
             
             # Insert new user with auto-detected role
             await cursor.execute("""
@@ -609,7 +822,7 @@ async def register_user(registration: Registration):
                 address, sex, is_active, created_at
             ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
             """, (
-                registration.email,
+                email,
                 password_hash,
                 role,
                 registration.first_name.strip(),
@@ -618,63 +831,30 @@ async def register_user(registration: Registration):
                 registration.sex or None,
                 is_active
             ))
-            
-            # Get the inserted user ID
-            await cursor.execute("SELECT * FROM users WHERE email = %s", (registration.email,))
-            result = await cursor.fetchone()
+            user_id = cursor.lastrowid
             
             if role == 'doctor':
-                # Doctor-specific validation
-                if not registration.medical_license or not registration.specialization:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Medical license and specialization are required for doctor registration"
-                    )
-                
-                # Check if medical license already exists
-                await cursor.execute("SELECT COUNT(*) FROM doctors WHERE medical_license = %s", (registration.medical_license,))
-                existing_license = (await cursor.fetchone())[0]
-                
-                if existing_license > 0:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Medical license already registered"
-                    )
-                
                 # Create doctor profile
                 await cursor.execute("""
                 INSERT INTO doctors (user_id, medical_license, specialization, ptr_number)
                 VALUES (%s, %s, %s, %s)
-                """, (result[0], registration.medical_license.strip(), registration.specialization.strip(), registration.ptr_number.strip() if registration.ptr_number else None))
+                """, (user_id, registration.medical_license.strip(), registration.specialization.strip(), registration.ptr_number.strip() if registration.ptr_number else None))
                 
-                print(f"✅ Doctor profile created for {registration.email}")
+                logger.info("Doctor profile created for %s", email)
             else:
-                # Patient-specific validation
-                if not registration.date_of_birth:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Date of birth is required for patient registration"
-                    )
-                
-                # Convert date string to date object
-                try:
-                    dob_date = datetime.strptime(registration.date_of_birth, "%Y-%m-%d").date()
-                except ValueError:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Invalid date format. Please use YYYY-MM-DD format."
-                    )
-                
                 # Create patient profile
                 await cursor.execute("""
                 INSERT INTO patients (user_id, date_of_birth, phone, address)
                 VALUES (%s, %s, %s, %s)
-                """, (result[0], dob_date, registration.phone or None, registration.address.strip() if registration.address else None))
+                """, (user_id, dob_date, registration.phone or None, registration.address.strip() if registration.address else None))
                 
-                print(f"✅ Patient profile created for {registration.email}")
+                logger.info("Patient profile created for %s", email)
+            
+            await conn.commit()
         
         except Exception as e:
-            print(f"Registration error details: {e}")
+            await conn.rollback()
+            logger.warning("Registration error details: %s", e)
             if "Duplicate entry" in str(e) and "email" in str(e):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -685,11 +865,6 @@ async def register_user(registration: Registration):
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Medical license already registered"
                 )
-            elif "Invalid date format" in str(e):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid date format. Please use YYYY-MM-DD format."
-                )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Registration failed. Please try again."
@@ -698,21 +873,20 @@ async def register_user(registration: Registration):
             if cursor:
                 await cursor.close()
         
-        # Prepare response - fix field mapping from database tuple
-        # result tuple: (id, email, password_hash, role, first_name, last_name, is_active, created_at, updated_at)
-        full_name = f"{result[4]} {result[5]}"  # first_name, last_name from tuple
+        first_name = registration.first_name.strip()
+        last_name = registration.last_name.strip()
+        full_name = f"{first_name} {last_name}"
         if role == 'doctor':
             full_name = f"Dr. {full_name}"
         
         user_response = {
-            "id": result[0],
-            "email": result[1],
-            "role": result[3],
-            "first_name": result[4],
-            "last_name": result[5],
+            "id": user_id,
+            "email": email,
+            "role": role,
+            "first_name": first_name,
+            "last_name": last_name,
             "full_name": full_name,
-            "is_active": result[6],
-            "created_at": result[7].isoformat() if result[7] and hasattr(result[7], 'isoformat') else str(result[7]) if result[7] else None
+            "is_active": is_active
         }
         
         # Prepare response based on role and verification status
@@ -727,41 +901,39 @@ async def register_user(registration: Registration):
             medical_note = "Your account is ready for immediate use"
             
             # Send welcome email to patient
-            patient_name = f"{result[4]} {result[5]}"
-            patient_email = result[1]
+            patient_name = f"{first_name} {last_name}"
+            patient_email = email
             
             subject, text_content, html_content = email_service.get_patient_welcome_template(patient_name, patient_email)
             email_sent = await email_service.send_email(patient_email, subject, html_content, text_content)
             
             if email_sent:
-                print(f"✅ Welcome email sent to: {patient_email}")
+                logger.info("Welcome email sent to: %s", patient_email)
             else:
-                print(f"❌ Failed to send welcome email to: {patient_email}")
+                logger.warning("Failed to send welcome email to: %s", patient_email)
         
-        return {
+        # Built from trusted values, so skip response_model re-validation
+        return ORJSONResponse({
             "success": True,
             "user": user_response,
             "message": role_message,
-            "token": f"{role}_token_{result[0]}_{datetime.now().timestamp()}",
+            "token": create_access_token(user_id, role),
             "medical_note": medical_note,
             "requires_verification": role == 'doctor',
             "email_sent": role == 'patient'  # Only true for patients since doctors get email after verification
-        }
+        })
 
 @app.post("/api/auth/login", response_model=Dict[str, Any])
 async def login(login_data: UserLogin):
     """Authenticate user with MySQL - NO AUTO-REGISTRATION"""
-    print("=" * 50)
-    print(f"🔐 LOGIN ATTEMPT")
-    print(f"📧 Email: '{login_data.email}'")
+    logger.debug("Login attempt: %r", login_data.email)
     
     # --- ADMIN BYPASS: admin / admin (disabled by default) ---
-    email_trimmed = login_data.email.strip().lower()
+    email_trimmed = login_data.email
     pass_trimmed = login_data.password.strip()
     
-    if ADMIN_BYPASS_ENABLED and ((email_trimmed == "admin" and pass_trimmed == "admin") or (email_trimmed == "admin@medical.com" and pass_trimmed == "admin") or (email_trimmed == "admin@medical.com" and pass_trimmed == "admin@123")):
-        print("🔑 ADMIN BYPASS LOGIN")
-        print("=" * 50)
+    if ADMIN_BYPASS_ENABLED and (email_trimmed, pass_trimmed) in _ADMIN_BYPASS_CREDENTIALS:
+        logger.info("Admin bypass login")
         return {
             "success": True,
             "user": {
@@ -776,7 +948,7 @@ async def login(login_data: UserLogin):
                 "created_at": datetime.now().isoformat()
             },
             "message": "Admin bypass login successful",
-            "token": f"admin-bypass-token-{datetime.now().timestamp()}"
+            "token": create_access_token(0, "admin")
         }
     
     pool = await get_connection()
@@ -785,14 +957,19 @@ async def login(login_data: UserLogin):
         cursor = await conn.cursor()
         
         # Find user - check if exists (including inactive doctors for better error messages)
-        await cursor.execute("SELECT * FROM users WHERE email = %s", (login_data.email.strip(),))
+        # Single round-trip; explicit columns so tuple indexes don't depend on
+        # migration-added columns (address, sex) and unused ones aren't transferred
+        await cursor.execute("""
+        SELECT id, email, password_hash, role, first_name, last_name, is_active, created_at
+        FROM users WHERE email = %s
+        """, (email_trimmed,))
         user = await cursor.fetchone()
         
         if not user:
-            print(f"❌ USER NOT FOUND: {login_data.email}")
+            logger.debug("Login user not found: %s", login_data.email)
             
             # Suggest registration based on email domain
-            domain = login_data.email.split('@')[-1].lower()
+            domain = email_trimmed.rpartition('@')[2]
             if domain == 'medical.com':
                 suggestion = "Please register as a doctor first."
             else:
@@ -805,7 +982,7 @@ async def login(login_data: UserLogin):
         
         # Check if user is active
         if not user[6]:  # is_active field
-            print(f"❌ USER INACTIVE: {login_data.email} (Role: {user[3]})")
+            logger.debug("Login user inactive: %s (role: %s)", login_data.email, user[3])
             
             if user[3] == 'doctor':
                 raise HTTPException(
@@ -818,23 +995,28 @@ async def login(login_data: UserLogin):
                     detail="Your account has been deactivated. Please contact support."
                 )
         
-        print(f"✅ User found: {user[1]} (Role: {user[3]})")
+        logger.debug("Login user found: %s (role: %s)", user[1], user[3])
         
-        # Calculate hash of input password
-        input_hash = hash_password(login_data.password.strip())
+        # Verify password (hashing runs on the hash pool, off the event loop)
+        password_ok, new_hash = await _run_password_hashing(
+            verify_and_update_password, login_data.password.strip(), user[2]
+        )
         
-        if input_hash != user[2]:  # password_hash is at index 2
-            print(f"❌ PASSWORD MISMATCH!")
+        if not password_ok:  # password_hash is at index 2
+            logger.debug("Login password mismatch: %s", user[1])
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
-        print(f"🎉 LOGIN SUCCESSFUL for {user[1]}!")
-        print("=" * 50)
+        if new_hash:
+            # Legacy SHA-256/bcrypt hash (or outdated Argon2 cost) - store the upgraded hash
+            await cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_hash, user[0]))
+        
+        logger.debug("Login successful: %s", user[1])
         
         # Prepare user response
-        # user tuple: (id, email, password_hash, role, first_name, last_name, is_active, created_at, updated_at)
+        # user tuple: (id, email, password_hash, role, first_name, last_name, is_active, created_at)
         full_name = f"{user[4]} {user[5]}"
         if user[3] == 'doctor':
             full_name = f"Dr. {full_name}"
@@ -851,12 +1033,13 @@ async def login(login_data: UserLogin):
         }
         
         try:
-            return {
+            # Built from trusted values, so skip response_model re-validation
+            return ORJSONResponse({
                 "success": True,
                 "user": user_response,
                 "message": "Login successful",
-                "token": f"auth-token-{user[0]}-{datetime.now().timestamp()}"
-            }
+                "token": create_access_token(user[0], user[3])
+            })
         finally:
             if cursor:
                 await cursor.close()
@@ -878,9 +1061,7 @@ async def predict_symptoms(request: Request, payload: Dict[str, Any]):
         result = await symptom_predictor.predict(symptoms, description)
         return result
     except Exception as e:
-        print(f"❌ Prediction error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Prediction error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Submit symptoms/case
@@ -895,73 +1076,48 @@ async def submit_case(request: Request, case_data: Dict[str, Any]):
             cursor = await conn.cursor()
             
             # Get current user from auth header
-            current_user_id = None
             auth_header = request.headers.get("Authorization")
+            current_user_id = _extract_user_id_from_auth_header(auth_header)
             
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-                try:
-                    # Handle multiple token formats
-                    if "auth-token-" in token:
-                        token_parts = token.split("-")
-                        if len(token_parts) >= 3:
-                            current_user_id = int(token_parts[2])
-                    elif "patient_token_" in token:
-                        # Format: patient_token_{user_id}_{timestamp}
-                        token_parts = token.split("_")
-                        if len(token_parts) >= 3:
-                            current_user_id = int(token_parts[2])
-                    elif "doctor_token_" in token:
-                        # Format: doctor_token_{user_id}_{timestamp}
-                        token_parts = token.split("_")
-                        if len(token_parts) >= 3:
-                            current_user_id = int(token_parts[2])
-                    elif "admin_token_" in token:
-                        # Format: admin_token_{user_id}_{timestamp}
-                        token_parts = token.split("_")
-                        if len(token_parts) >= 3:
-                            current_user_id = int(token_parts[2])
-                    elif "demo-token-" in token:
-                        # Demo token format - use demo user ID
-                        if "patient" in token:
-                            current_user_id = 26  # Use the actual patient ID from logs
-                        elif "doctor" in token:
-                            current_user_id = 2
-                        elif "admin" in token:
-                            current_user_id = 0
-                    elif "admin-bypass-token-" in token:
-                        # Admin bypass token
-                        current_user_id = 0
-                except (ValueError, IndexError) as e:
-                    print(f"⚠️ Token parsing error: {e}")
-                    pass
+            if current_user_id is None and auth_header and "demo-token-" in auth_header:
+                # Demo token format - use demo user ID
+                if "patient" in auth_header:
+                    current_user_id = 26  # Use the actual patient ID from logs
+                elif "doctor" in auth_header:
+                    current_user_id = 2
+                elif "admin" in auth_header:
+                    current_user_id = 0
             
-            if not current_user_id:
+            # Resolve the patient id + name in a single lookup
+            patient = None
+            if current_user_id:
+                await cursor.execute("SELECT id, first_name, last_name FROM users WHERE id = %s", (current_user_id,))
+                patient = await cursor.fetchone()
+            else:
                 # Try to get user from email in request
                 email = case_data.get('patient_email')
                 if email:
-                    await cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
-                    user = await cursor.fetchone()
-                    if user:
-                        current_user_id = user[0]
+                    await cursor.execute(
+                        "SELECT id, first_name, last_name FROM users WHERE email = %s",
+                        (email.strip().lower(),)
+                    )
+                    patient = await cursor.fetchone()
+                    if patient:
+                        current_user_id = patient[0]
             
             if not current_user_id:
                 raise HTTPException(status_code=401, detail="User not authenticated")
             
-            # Get patient name
-            await cursor.execute("SELECT first_name, last_name FROM users WHERE id = %s", (current_user_id,))
-            patient = await cursor.fetchone()
-            patient_name = f"{patient[0]} {patient[1]}" if patient else "Unknown Patient"
+            patient_name = f"{patient[1]} {patient[2]}" if patient else "Unknown Patient"
             
-            # Insert new case
+            # Insert new case (created_at comes from the database clock)
             await cursor.execute("""
                 INSERT INTO medical_cases (patient_id, symptoms, ai_assessment, status, created_at)
-                VALUES (%s, %s, %s, 'pending_review', %s)
+                VALUES (%s, %s, %s, 'pending_review', CURRENT_TIMESTAMP)
             """, (
                 current_user_id,
                 json.dumps(case_data.get('symptoms', {})),
-                json.dumps(case_data.get('ai_assessment', {})),
-                datetime.now()
+                json.dumps(case_data.get('ai_assessment', {}))
             ))
             
             case_id = cursor.lastrowid
@@ -977,11 +1133,7 @@ async def submit_case(request: Request, case_data: Dict[str, Any]):
             }
             
     except Exception as e:
-        print(f"❌ Error submitting case: {e}")
-        print(f"❌ Error type: {type(e)}")
-        print(f"❌ Error args: {e.args}")
-        import traceback
-        print(f"❌ Full traceback: {traceback.format_exc()}")
+        logger.exception("Error submitting case: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         if cursor:
@@ -1005,14 +1157,22 @@ async def get_patient_cases(request: Request):
             if current_user_id is None:
                 raise HTTPException(status_code=401, detail="User not authenticated")
             
-            # Get cases for current patient with full patient + doctor info
+            # Get cases for current patient with full patient + doctor info.
+            # Timestamps, names and age are formatted by MySQL so rows need no per-field Python work.
             await cursor.execute("""
-            SELECT c.id, c.symptoms, c.ai_assessment, c.status, c.created_at,
-                   c.doctor_diagnosis, c.doctor_notes, c.prescription, c.reviewed_at,
-                   u.first_name, u.last_name, u.address, u.sex,
-                   p.date_of_birth,
-                   du.first_name, du.last_name,
-                   d.medical_license, d.ptr_number
+            SELECT c.id, c.symptoms, c.ai_assessment, c.status,
+                   DATE_FORMAT(c.created_at, '%%Y-%%m-%%dT%%H:%%i:%%s'),
+                   c.doctor_diagnosis, c.doctor_notes, c.prescription,
+                   DATE_FORMAT(c.reviewed_at, '%%Y-%%m-%%dT%%H:%%i:%%s'),
+                   CONCAT(u.first_name, ' ', u.last_name), u.address, u.sex,
+                   TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()),
+                   IF(COALESCE(du.first_name, '') = '' AND COALESCE(du.last_name, '') = '', '',
+                      TRIM(CONCAT('Dr. ', COALESCE(du.first_name, ''), ' ', COALESCE(du.last_name, '')))),
+                   d.medical_license, d.ptr_number,
+                   (SELECT pr.doctor_signature FROM prescriptions pr
+                    WHERE pr.case_id = c.id
+                    ORDER BY pr.created_at DESC
+                    LIMIT 1)
             FROM medical_cases c
             JOIN users u ON c.patient_id = u.id
             LEFT JOIN patients p ON p.user_id = u.id
@@ -1023,7 +1183,7 @@ async def get_patient_cases(request: Request):
             """, (current_user_id,))
             
             cases = await cursor.fetchall()
-            print(f"Fetched {len(cases)} cases for patient ID {current_user_id}")
+            logger.debug("Fetched %d cases for patient ID %s", len(cases), current_user_id)
             
             # Convert to response format
             case_list = []
@@ -1035,64 +1195,43 @@ async def get_patient_cases(request: Request):
                 # Parse prescription data
                 prescription_data = json.loads(case[7]) if case[7] else None
                 
-                # If prescription exists, try to get the signature from prescriptions table
-                if prescription_data:
-                    await cursor.execute("""
-                    SELECT doctor_signature FROM prescriptions 
-                    WHERE case_id = %s 
-                    ORDER BY created_at DESC 
-                    LIMIT 1
-                    """, (case[0],))
-                    signature_result = await cursor.fetchone()
-                    
-                    if signature_result and signature_result[0]:
-                        # Add signature to prescription data
-                        prescription_data['doctor_signature'] = signature_result[0]
+                # If prescription exists, attach the latest signature from the prescriptions
+                # table (fetched by the subquery above instead of one query per case)
+                if prescription_data and case[16]:
+                    prescription_data['doctor_signature'] = case[16]
                 
-                # Calculate age from date_of_birth
-                dob = case[13]
-                age_str = ''
-                if dob:
-                    from datetime import date as date_type
-                    today = date_type.today()
-                    dob_d = dob if isinstance(dob, date_type) else datetime.strptime(str(dob), '%Y-%m-%d').date()
-                    age_str = str(today.year - dob_d.year - ((today.month, today.day) < (dob_d.month, dob_d.day)))
-
-                doctor_first = case[14] or ''
-                doctor_last = case[15] or ''
-                doctor_name = f"Dr. {doctor_first} {doctor_last}".strip() if doctor_first or doctor_last else ''
-
                 case_list.append({
                     "id": case[0],
                     "title": title,
                     "symptoms": symptoms_data,
-                    "ai_assessment": json.loads(case[2]) if case[2] else {},
+                    "ai_assessment": _json_fragment(case[2], {}),
                     "status": case[3],
-                    "created_at": case[4].isoformat() if case[4] and hasattr(case[4], 'isoformat') else str(case[4]) if case[4] else None,
+                    "created_at": case[4],
                     "doctor_diagnosis": case[5],
                     "doctor_notes": case[6],
                     "prescription": prescription_data,
-                    "reviewed_at": case[8].isoformat() if case[8] and hasattr(case[8], 'isoformat') else str(case[8]) if case[8] else None,
+                    "reviewed_at": case[8],
                     "patient_id": current_user_id,
-                    "patient_name": f"{case[9]} {case[10]}",
-                    "patient_address": case[11] or '',
-                    "patient_sex": case[12] or '',
-                    "patient_age": age_str,
-                    "doctor_name": doctor_name,
-                    "doctor_license": case[16] or '',
-                    "doctor_ptr": case[17] or ''
+                    "patient_name": case[9],
+                    "patient_address": case[10] or '',
+                    "patient_sex": case[11] or '',
+                    "patient_age": str(case[12]) if case[12] is not None else '',
+                    "doctor_name": case[13] or '',
+                    "doctor_license": case[14] or '',
+                    "doctor_ptr": case[15] or ''
                 })
         
         await cursor.close()
         
-        return {
+        # ai_assessment is passed through as raw JSON, so serialize with orjson directly
+        return ORJSONResponse({
             "success": True,
             "cases": case_list,
             "total": len(case_list)
-        }
+        })
         
     except Exception as e:
-        print(f"⚠️ Database error in get_patient_cases: {e}")
+        logger.warning("Database error in get_patient_cases: %s", e)
         # Fallback: return demo cases when database is not available
         import json
         from datetime import datetime, timedelta
@@ -1165,38 +1304,43 @@ async def get_patient_cases(request: Request):
 
 # Get doctor cases
 @app.get("/api/doctor/cases", response_model=Dict[str, Any])
-async def get_doctor_cases():
-    """Get cases for doctor review"""
+async def get_doctor_cases(
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """Get cases for doctor review, newest first.
+
+    Without limit the whole list is returned, as before. With limit, offset
+    pages through it and has_more tells whether another page follows.
+    """
     pool = await get_connection()
     
     async with pool.acquire() as conn:
         cursor = await conn.cursor()
         
-        # First, check all cases and their statuses
-        await cursor.execute("""
-        SELECT c.id, c.status, c.patient_id, u.first_name, u.last_name
+        # Get ALL cases (pending, in_review, and completed) with patient names and doctor review fields.
+        # Timestamps and names are formatted by MySQL so rows need no per-field Python work.
+        query = """
+        SELECT c.id, c.symptoms, c.ai_assessment, c.status,
+               DATE_FORMAT(c.created_at, '%%Y-%%m-%%dT%%H:%%i:%%s'),
+               CONCAT(u.first_name, ' ', u.last_name),
+               c.doctor_diagnosis, c.doctor_notes, c.prescription,
+               DATE_FORMAT(c.reviewed_at, '%%Y-%%m-%%dT%%H:%%i:%%s')
         FROM medical_cases c
         JOIN users u ON c.patient_id = u.id
         ORDER BY c.created_at DESC
-        """)
-        
-        all_cases = await cursor.fetchall()
-        print(f"📋 All cases in database: {len(all_cases)}")
-        for case in all_cases:
-            print(f"  Case ID: {case[0]}, Status: {case[1]}, Patient: {case[3]} {case[4]}")
-        
-        # Get ALL cases (pending, in_review, and completed) with patient names and doctor review fields
-        await cursor.execute("""
-        SELECT c.id, c.symptoms, c.ai_assessment, c.status, c.created_at,
-               u.first_name, u.last_name,
-               c.doctor_diagnosis, c.doctor_notes, c.prescription, c.reviewed_at
-        FROM medical_cases c
-        JOIN users u ON c.patient_id = u.id
-        ORDER BY c.created_at DESC
-        """)
+        """
+        if limit is None:
+            await cursor.execute(query, ())
+        else:
+            # One extra row tells whether another page follows, without a COUNT(*)
+            await cursor.execute(query + "LIMIT %s OFFSET %s", (limit + 1, offset))
         
         cases = await cursor.fetchall()
-        print(f"📋 Cases for doctor review: {len(cases)}")
+        has_more = limit is not None and len(cases) > limit
+        if has_more:
+            cases = cases[:limit]
+        logger.debug("Cases for doctor review: %d (offset %d, more: %s)", len(cases), offset, has_more)
         
         # Convert to response format
         case_list = []
@@ -1209,23 +1353,33 @@ async def get_doctor_cases():
                 "id": case[0],
                 "title": title,
                 "symptoms": symptoms_data,
-                "ai_assessment": json.loads(case[2]) if case[2] else {},
+                "ai_assessment": _json_fragment(case[2], {}),
                 "status": case[3],
-                "created_at": case[4].isoformat() if case[4] and hasattr(case[4], 'isoformat') else str(case[4]) if case[4] else None,
-                "patient_name": f"{case[5]} {case[6]}",
-                "doctor_diagnosis": case[7],
-                "doctor_notes": case[8],
-                "prescription": json.loads(case[9]) if case[9] else None,
-                "reviewed_at": case[10].isoformat() if case[10] and hasattr(case[10], 'isoformat') else str(case[10]) if case[10] else None,
+                "created_at": case[4],
+                "patient_name": case[5],
+                "doctor_diagnosis": case[6],
+                "doctor_notes": case[7],
+                "prescription": _json_fragment(case[8], None),
+                "reviewed_at": case[9],
             })
         
         await cursor.close()
         
-        return {
+        if limit is None:
+            # ai_assessment / prescription are passed through as raw JSON
+            return ORJSONResponse({
+                "success": True,
+                "cases": case_list,
+                "total": len(case_list)
+            })
+        
+        return ORJSONResponse({
             "success": True,
             "cases": case_list,
-            "total": len(case_list)
-        }
+            "limit": limit,
+            "offset": offset,
+            "has_more": has_more
+        })
 
 # Review case
 @app.post("/api/cases/{case_id}/review", response_model=Dict[str, Any])
@@ -1249,45 +1403,59 @@ async def review_case(case_id: int, review_data: Dict[str, Any]):
         
         patient_id = case_details[0]
         
-        # Update case with review including prescription
-        await cursor.execute("""
-        UPDATE medical_cases 
-        SET doctor_diagnosis = %s, doctor_notes = %s, prescription = %s, status = 'completed', reviewed_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-        """, (
-            review_data.get("doctor_diagnosis", ""),
-            review_data.get("doctor_notes", ""),
-            prescription_json,
-            case_id
-        ))
-        
-        # Create prescription records if prescription data exists
-        prescription_ids = []
-        if prescription_data and prescription_data.get("medicines"):
-            medicines = prescription_data.get("medicines", [])
-            for medicine in medicines:
-                duration_val = medicine.get("duration_days", 0)
-                try:
-                    duration_val = int(duration_val) if duration_val is not None else 0
-                except (ValueError, TypeError):
-                    duration_val = 0
-                await cursor.execute("""
-                INSERT INTO prescriptions (case_id, patient_id, doctor_id, medication_name, dosage, frequency, duration, instructions, doctor_signature, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                """, (
-                    case_id,
-                    patient_id,
-                    review_data.get("doctor_id", 1),  # Get from auth token in real implementation
-                    medicine.get("medication_name", ""),
-                    medicine.get("dosage", ""),
-                    medicine.get("frequency", ""),
-                    duration_val,
-                    medicine.get("instructions", ""),
-                    prescription_data.get("doctor_signature", "")
-                ))
-                prescription_ids.append(cursor.lastrowid)
+        # Case update + prescription rows are committed together
+        await conn.begin()
+        try:
+            # Update case with review including prescription
+            await cursor.execute("""
+            UPDATE medical_cases 
+            SET doctor_diagnosis = %s, doctor_notes = %s, prescription = %s, status = 'completed', reviewed_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+            """, (
+                review_data.get("doctor_diagnosis", ""),
+                review_data.get("doctor_notes", ""),
+                prescription_json,
+                case_id
+            ))
 
-        await conn.commit()
+            # Create prescription records if prescription data exists
+            prescription_ids = []
+            if prescription_data and prescription_data.get("medicines"):
+                medicines = prescription_data.get("medicines", [])
+                rows = []
+                for medicine in medicines:
+                    duration_val = medicine.get("duration_days", 0)
+                    try:
+                        duration_val = int(duration_val) if duration_val is not None else 0
+                    except (ValueError, TypeError):
+                        duration_val = 0
+                    rows.append((
+                        case_id,
+                        patient_id,
+                        review_data.get("doctor_id", 1),  # Get from auth token in real implementation
+                        medicine.get("medication_name", ""),
+                        medicine.get("dosage", ""),
+                        medicine.get("frequency", ""),
+                        duration_val,
+                        medicine.get("instructions", ""),
+                        prescription_data.get("doctor_signature", "")
+                    ))
+
+                # executemany rewrites this into a single multi-row INSERT (one round-trip);
+                # created_at is left to the column default so the VALUES clause stays batchable
+                await cursor.executemany("""
+                INSERT INTO prescriptions (case_id, patient_id, doctor_id, medication_name, dosage, frequency, duration, instructions, doctor_signature)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, rows)
+
+                # A single multi-row INSERT gets consecutive AUTO_INCREMENT ids
+                # starting at lastrowid, so no read-back query is needed
+                prescription_ids = list(range(cursor.lastrowid, cursor.lastrowid + len(rows)))
+
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
         
         await cursor.close()
         
@@ -1327,21 +1495,53 @@ async def clear_database():
             detail=f"Failed to clear database: {str(e)}"
         )
 
+# Database probe shared by the health endpoints. Load balancer / k8s probes hit
+# these every few seconds, so a successful SELECT 1 is reused for a short window.
+HEALTH_PROBE_TTL = float(os.getenv("HEALTH_PROBE_TTL", "5"))
+_last_db_probe_ok = 0.0
+
+async def _probe_database() -> int:
+    """Run SELECT 1 unless one succeeded within HEALTH_PROBE_TTL seconds"""
+    global _last_db_probe_ok
+    if time.monotonic() - _last_db_probe_ok < HEALTH_PROBE_TTL:
+        return 1
+    pool = await get_connection()
+    async with pool.acquire() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute("SELECT 1")
+        result = await cursor.fetchone()
+        await cursor.close()
+    _last_db_probe_ok = time.monotonic()
+    return result[0] if result else None
+
+@app.get("/api/live", response_model=Dict[str, Any])
+async def liveness_check():
+    """Process liveness probe (no database access)"""
+    return {"status": "alive"}
+
+@app.get("/api/ready", response_model=Dict[str, Any])
+async def readiness_check():
+    """Readiness probe - verifies the database is reachable"""
+    try:
+        await _probe_database()
+    except Exception as e:
+        return ORJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "database": "disconnected", "error": str(e)}
+        )
+    return {"status": "ready", "database": "connected"}
+
 @app.get("/api/admin/health", response_model=Dict[str, Any])
 async def admin_health_check():
     """Health check for admin endpoints"""
     try:
-        pool = await get_connection()
-        async with pool.acquire() as conn:
-            cursor = await conn.cursor()
-            await cursor.execute("SELECT 1")
-            result = await cursor.fetchone()
+        test_query = await _probe_database()
             
         return {
             "success": True,
             "message": "Admin endpoints are healthy",
             "database": "connected",
-            "test_query": result[0] if result else None
+            "test_query": test_query
         }
     except Exception as e:
         return {
@@ -1359,18 +1559,19 @@ async def get_case_statuses(request: Request):
 
     pool = await get_connection()
     async with pool.acquire() as conn:
-        cursor = await conn.cursor()
+        cursor = await conn.cursor(aiomysql.DictCursor)
         await cursor.execute(
-            "SELECT status, COUNT(*) as cnt FROM medical_cases GROUP BY status ORDER BY cnt DESC"
+            "SELECT status, COUNT(*) AS count FROM medical_cases GROUP BY status ORDER BY count DESC"
         )
         rows = await cursor.fetchall()
         await cursor.close()
 
-    return {
+    # DictCursor rows already have the response shape
+    return ORJSONResponse({
         "success": True,
-        "statuses": [{"status": r[0], "count": r[1]} for r in rows],
+        "statuses": rows,
         "total_distinct": len(rows),
-    }
+    })
 
 @app.post("/api/admin/create-admin", response_model=Dict[str, Any])
 async def create_admin_account(admin_data: Dict[str, Any]):
@@ -1391,7 +1592,7 @@ async def create_admin_account(admin_data: Dict[str, Any]):
             )
         
         # Hash password
-        password_hash = hash_password(admin_data.get("password"))
+        password_hash = await _run_password_hashing(hash_password, admin_data.get("password"))
         
         # Create new admin
         await cursor.execute("""
@@ -1407,7 +1608,7 @@ async def create_admin_account(admin_data: Dict[str, Any]):
         
         admin_id = cursor.lastrowid
         
-        print(f"🔧 New admin account created: {admin_data.get('email')}")
+        logger.info("New admin account created: %s", admin_data.get("email"))
         
         return {
             "success": True,
@@ -1423,7 +1624,7 @@ async def get_all_users():
     pool = await get_connection()
     
     async with pool.acquire() as conn:
-        cursor = await conn.cursor()
+        cursor = await conn.cursor(aiomysql.DictCursor)
         
         await cursor.execute("""
         SELECT id, email, role, first_name, last_name, is_active, created_at
@@ -1431,26 +1632,15 @@ async def get_all_users():
         ORDER BY created_at DESC
         """)
         
+        # DictCursor rows already have the response shape; serialize them as-is
         users = await cursor.fetchall()
+        await cursor.close()
         
-        # Convert to list of dictionaries
-        user_list = []
-        for user in users:
-            user_list.append({
-                "id": user[0],
-                "email": user[1],
-                "role": user[2],
-                "first_name": user[3],
-                "last_name": user[4],
-                "is_active": user[5],
-                "created_at": user[6].isoformat() if user[6] else None
-            })
-        
-        return {
+        return ORJSONResponse({
             "success": True,
-            "users": user_list,
-            "total": len(user_list)
-        }
+            "users": users,
+            "total": len(users)
+        })
 
 @app.get("/api/admin/doctors", response_model=Dict[str, Any])
 async def get_doctors_for_verification():
@@ -1480,7 +1670,7 @@ async def get_doctors_for_verification():
                 "first_name": doctor[2],
                 "last_name": doctor[3],
                 "is_active": doctor[4],
-                "created_at": doctor[5].isoformat() if doctor[5] else None,
+                "created_at": doctor[5],
                 "medical_license": doctor[6],
                 "specialization": doctor[7],
                 "is_verified": bool(doctor[8]) if doctor[8] is not None else False
@@ -1494,7 +1684,7 @@ async def get_doctors_for_verification():
 @app.post("/api/admin/doctors/{doctor_id}/verify", response_model=Dict[str, Any])
 async def verify_doctor(doctor_id: int, verification_data: Dict[str, Any]):
     """Verify or reject a doctor's credentials"""
-    print(f"🛂 verify_doctor called for doctor_id={doctor_id} payload_keys={list(verification_data.keys())}")
+    logger.debug("verify_doctor called for doctor_id=%s payload_keys=%s", doctor_id, list(verification_data))
     pool = await get_connection()
     
     async with pool.acquire() as conn:
@@ -1536,7 +1726,7 @@ async def verify_doctor(doctor_id: int, verification_data: Dict[str, Any]):
         # If verified, activate the user account
         if is_verified:
             await cursor.execute("UPDATE users SET is_active = TRUE WHERE id = %s", (doctor_id,))
-            print(f"✅ Activated doctor account: {doctor[1]}")
+            logger.info("Activated doctor account: %s", doctor[1])
             
             # Send approval email
             doctor_name = f"{doctor[2]} {doctor[3]}"
@@ -1546,12 +1736,12 @@ async def verify_doctor(doctor_id: int, verification_data: Dict[str, Any]):
             email_sent = await email_service.send_email(doctor_email, subject, html_content, text_content)
             
             if email_sent:
-                print(f"✅ Approval email sent to: {doctor_email}")
+                logger.info("Approval email sent to: %s", doctor_email)
             else:
-                print(f"❌ Failed to send approval email to: {doctor_email}")
+                logger.warning("Failed to send approval email to: %s", doctor_email)
         
         action = "verified" if is_verified else "rejected"
-        print(f"🔍 Admin {action} doctor: {doctor[1]} (ID: {doctor_id})")
+        logger.info("Admin %s doctor: %s (ID: %s)", action, doctor[1], doctor_id)
         
         return {
             "success": True,
@@ -1589,7 +1779,7 @@ async def toggle_user_status(user_id: int):
         """, (new_status, user_id))
         
         action = "enabled" if new_status else "disabled"
-        print(f"🔧 Admin {action} user: {user[0]} (ID: {user_id})")
+        logger.info("Admin %s user: %s (ID: %s)", action, user[0], user_id)
         
         return {
             "success": True,
@@ -1607,31 +1797,27 @@ async def get_admin_stats():
         async with pool.acquire() as conn:
             cursor = await conn.cursor()
             
-            # Get user counts
-            await cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'patient'")
-            patient_count = (await cursor.fetchone())[0]
-            
-            await cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'doctor'")
-            doctor_count = (await cursor.fetchone())[0]
-            
-            await cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
-            admin_count = (await cursor.fetchone())[0]
-            
-            # Get verified doctors count
+            # All counters in one round-trip instead of six sequential queries
             await cursor.execute("""
-            SELECT COUNT(*) FROM doctors d 
-            JOIN users u ON d.user_id = u.id 
-            WHERE u.role = 'doctor' AND d.is_verified = TRUE
+            SELECT
+                (SELECT COUNT(*) FROM users WHERE role = 'patient'),
+                (SELECT COUNT(*) FROM users WHERE role = 'doctor'),
+                (SELECT COUNT(*) FROM users WHERE role = 'admin'),
+                (SELECT COUNT(*) FROM doctors d
+                 JOIN users u ON d.user_id = u.id
+                 WHERE u.role = 'doctor' AND d.is_verified = TRUE),
+                (SELECT COUNT(*) FROM medical_cases WHERE status = 'pending_review'),
+                (SELECT COUNT(*) FROM medical_cases)
             """)
-            verified_doctors = (await cursor.fetchone())[0]
-            
-            # Get pending cases
-            await cursor.execute("SELECT COUNT(*) FROM medical_cases WHERE status = 'pending_review'")
-            pending_cases = (await cursor.fetchone())[0]
-            
-            # Get total cases
-            await cursor.execute("SELECT COUNT(*) FROM medical_cases")
-            total_cases = (await cursor.fetchone())[0]
+            (
+                patient_count,
+                doctor_count,
+                admin_count,
+                verified_doctors,
+                pending_cases,
+                total_cases,
+            ) = await cursor.fetchone()
+            await cursor.close()
             
             return {
                 "success": True,
@@ -1646,7 +1832,7 @@ async def get_admin_stats():
                 }
             }
     except Exception as e:
-        print(f"❌ Error in admin stats: {e}")
+        logger.warning("Error in admin stats: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -1668,40 +1854,39 @@ async def get_login_activity():
     pool = await get_connection()
     
     async with pool.acquire() as conn:
-        cursor = await conn.cursor()
+        cursor = await conn.cursor(aiomysql.DictCursor)
         
         # Get recent user registrations as activity indicator
         await cursor.execute("""
-        SELECT email, role, created_at, is_active
+        SELECT email, role, 'registration' AS activity_type, created_at AS timestamp, is_active
         FROM users 
         ORDER BY created_at DESC 
         LIMIT 20
         """)
         
-        recent_users = await cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        activity_list = []
-        for user in recent_users:
-            activity_list.append({
-                "email": user[0],
-                "role": user[1],
-                "activity_type": "registration",
-                "timestamp": user[2].isoformat() if user[2] else None,
-                "is_active": user[3]
-            })
+        # DictCursor rows already have the response shape; serialize them as-is
+        activity_list = await cursor.fetchall()
+        await cursor.close()
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "activities": activity_list,
             "total": len(activity_list)
-        }
+        })
 
 if __name__ == "__main__":
+    # Dev auto-reload is opt-in (UVICORN_RELOAD=true); it runs a single process
+    # with a file watcher, so multiple workers only apply without it.
+    reload_enabled = os.getenv("UVICORN_RELOAD", "false").strip().lower() == "true"
+    # Worker processes inherit the environment; share one signing key between them
+    os.environ.setdefault("SECRET_KEY", SECRET_KEY)
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        loop="auto",   # uvloop when installed (uvicorn[standard], non-Windows)
+        http="auto",   # httptools when installed
+        reload=reload_enabled,
+        workers=None if reload_enabled else WORKERS,
+        log_level=LOG_LEVEL
     )
\ No newline at end of file
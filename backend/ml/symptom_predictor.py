@@ -9,7 +9,11 @@ Symptom Predictor Service (v2 — ML Urgency Classifier)
 
 import os
 import json
-from openai import OpenAI
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 from ml.urgency_classifier import UrgencyClassifier
 
@@ -23,6 +27,11 @@ URGENCY_TO_LEVEL = {
     "low": "LEVEL 4",
 }
 
+# Identical symptom payloads are answered from memory instead of re-running the
+# ML + ChatGPT pipeline (a network round-trip on every miss).
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = int(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
 
 class SymptomPredictor:
     """ML-based symptom predictor using UrgencyClassifier + ChatGPT for disease prediction.
@@ -42,9 +51,42 @@ class SymptomPredictor:
         except Exception as e:
             print(f"❌ UrgencyClassifier init failed: {e}")
 
-        # OpenAI client (lazy — only created when needed for disease prediction)
+        # Async OpenAI client (lazy — only created when needed for disease prediction).
+        # Reused across calls so the HTTP connection pool is shared.
         self._openai_client = None
 
+        # Prediction cache: content hash -> (expires_at, result), kept in LRU order
+        self._cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._cache_locks: dict = {}
+
+    # ── Prediction cache ──
+    @staticmethod
+    def _cache_key(symptoms: dict, description: str) -> bytes:
+        """Content hash of the symptom payload (key order independent)."""
+        payload = json.dumps(
+            {"symptoms": symptoms, "description": description},
+            sort_keys=True,
+            default=str,
+        ).encode()
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def _cache_get(self, key: bytes):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: bytes, result: dict):
+        self._cache[key] = (time.monotonic() + PREDICTION_CACHE_TTL, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > PREDICTION_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
     # ── Extract human-readable symptom names from frontend dict ──
     def _extract_symptom_names(self, symptoms: dict, description: str = "") -> list:
         """Convert frontend symptom dict to a list of human-readable symptom names."""
@@ -65,7 +107,7 @@ class SymptomPredictor:
             api_key = os.getenv("CHATGPT_API_KEY")
             if not api_key:
                 raise RuntimeError("CHATGPT_API_KEY not set in .env")
-            self._openai_client = OpenAI(api_key=api_key)
+            self._openai_client = AsyncOpenAI(api_key=api_key)
         return self._openai_client
 
     async def predict_disease_chatgpt(self, symptom_names: list, description: str = "", urgency: str = "medium"):
@@ -100,7 +142,7 @@ class SymptomPredictor:
         )
 
         try:
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model=model,
                 messages=[
                     {
@@ -160,6 +202,41 @@ class SymptomPredictor:
 
     # ── Main predict pipeline ──
     async def predict(self, symptoms: dict, description: str = ""):
+        """
+        Cached entry point for the prediction pipeline.
+        Concurrent requests for the same payload share one lock so only the first
+        one reaches the ML classifier / ChatGPT; the rest read its result.
+        Results where either stage failed (urgency fallback or disease
+        ChatGPT call) are never cached.
+        """
+        key = self._cache_key(symptoms, description)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                cached = self._cache_get(key)
+                if cached is not None:
+                    return cached
+                result = await self._predict_uncached(symptoms, description)
+                if self._is_cacheable(result):
+                    self._cache_put(key, result)
+                return result
+        finally:
+            if not lock.locked() and self._cache_locks.get(key) is lock:
+                del self._cache_locks[key]
+
+    @staticmethod
+    def _is_cacheable(result: dict) -> bool:
+        """True unless the urgency or disease stage reported an error"""
+        for stage in (result.get("urgency_result"), result.get("chatgpt_result")):
+            if stage and (stage.get("method") == "chatgpt_error" or stage.get("error")):
+                return False
+        return True
+
+    async def _predict_uncached(self, symptoms: dict, description: str = ""):
         """
         Primary prediction pipeline (v2 — no old RF model, no rules):
         1. UrgencyClassifier predicts urgency (low/medium/high/critical)
@@ -177,7 +254,10 @@ class SymptomPredictor:
             enriched = {**symptoms}
             if description and "description" not in enriched:
                 enriched["description"] = description
-            urgency_result = self.urgency_classifier.predict_from_frontend(enriched)
+            # Sync sklearn (+ ChatGPT fallback) work: keep it off the event loop
+            urgency_result = await asyncio.to_thread(
+                self.urgency_classifier.predict_from_frontend, enriched
+            )
             urgency = urgency_result.get("urgency", "medium")
             urgency_confidence = urgency_result.get("confidence", 0.0)
             urgency_method = urgency_result.get("method", "unknown")
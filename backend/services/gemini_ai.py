@@ -440,7 +440,10 @@ class GeminiMedicalAI:
             urgency_probabilities = {}
 
             if self.urgency_classifier and self.ml_available:
-                urgency_result = self.urgency_classifier.predict_from_frontend(symptoms)
+                # Sync sklearn (+ ChatGPT fallback) work: keep it off the event loop
+                urgency_result = await asyncio.to_thread(
+                    self.urgency_classifier.predict_from_frontend, symptoms
+                )
                 urgency = urgency_result.get("urgency", "medium")
                 urgency_confidence = urgency_result.get("confidence", 0.0)
                 urgency_method = urgency_result.get("method", "unknown")
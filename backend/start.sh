@@ -13,5 +13,5 @@ fi
 # Install requirements
 pip install -r requirements.txt
 
-# Start the server
-uvicorn main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+# Start the server (workers/reload are configured in main.py: WORKERS, UVICORN_RELOAD)
+exec python main.py
\ No newline at end of file
@@ -17,15 +17,10 @@ def start_server():
     print('🔄 Loading ML engine and starting uvicorn...')
     print('=' * 80)
     
-    # Start uvicorn server
+    # Start uvicorn through main.py: multi-worker with uvloop/httptools,
+    # auto-reload only when UVICORN_RELOAD=true
     try:
-        subprocess.run([
-            sys.executable, '-m', 'uvicorn',
-            'main:app',
-            '--reload',
-            '--host', '0.0.0.0',
-            '--port', '8000'
-        ], check=True)
+        subprocess.run([sys.executable, 'main.py'], check=True)
     except KeyboardInterrupt:
         print('\n\n🛑 Server stopped by user')
     except Exception as e: